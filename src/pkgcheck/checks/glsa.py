@@ -4,6 +4,7 @@ from collections import defaultdict
 from pkgcore.pkgsets.glsa import GlsaDirSet
 from pkgcore.restrictions import packages, values
 from pkgcore.restrictions.util import collect_package_restrictions
+from snakeoil import klass
 from snakeoil.cli.arghparse import existent_dir
 from snakeoil.osutils import pjoin
 from snakeoil.strings import pluralism
@@ -12,6 +13,11 @@ from .. import results
 from . import GentooRepoCheck, SkipCheck
 
 
+def _strip_tilde(keyword):
+    """Strip the unstable prefix from a keyword without copying stable keywords."""
+    return keyword[1:] if keyword[0] == "~" else keyword
+
+
 class VulnerablePackage(results.VersionResult, results.Error):
     """Packages marked as vulnerable by GLSAs."""
 
@@ -20,7 +26,7 @@ class VulnerablePackage(results.VersionResult, results.Error):
         self.arches = tuple(arches)
         self.glsa = glsa
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.arches)
         arches = ", ".join(self.arches)
@@ -56,22 +62,29 @@ class GlsaCheck(GentooRepoCheck):
         self.vulns = defaultdict(list)
         for r in GlsaDirSet(glsa_dir):
             val = r[1] if len(r) <= 2 else packages.AndRestriction(*r[1:])
-            self.vulns[r[0].key].append(val)
+            self.vulns[r[0].key].append((val, self._vuln_arches(val)))
+
+    @staticmethod
+    def _vuln_arches(vuln):
+        """Extract the affected arches from a GLSA restriction.
+
+        An empty set is returned for GLSAs affecting all arches.
+        """
+        arches = set()
+        for v in collect_package_restrictions(vuln, ["keywords"]):
+            if not isinstance(v.restriction, values.ContainmentMatch2):
+                raise Exception(f"unexpected restriction sequence- {v.restriction} in {vuln}")
+            arches.update(map(_strip_tilde, v.restriction.vals))
+        return frozenset(arches)
 
     def feed(self, pkg):
-        for vuln in self.vulns.get(pkg.key, ()):
+        keys = None
+        for vuln, vuln_arches in self.vulns.get(pkg.key, ()):
             if vuln.match(pkg):
-                arches = set()
-                for v in collect_package_restrictions(vuln, ["keywords"]):
-                    if isinstance(v.restriction, values.ContainmentMatch2):
-                        arches.update(x.lstrip("~") for x in v.restriction.vals)
-                    else:
-                        raise Exception(
-                            f"unexpected restriction sequence- {v.restriction} in {vuln}"
-                        )
-                keys = {x.lstrip("~") for x in pkg.keywords if not x.startswith("-")}
-                if arches:
-                    arches = sorted(arches.intersection(keys))
+                if keys is None:
+                    keys = frozenset(_strip_tilde(x) for x in pkg.keywords if x[0] != "-")
+                if vuln_arches:
+                    arches = sorted(vuln_arches.intersection(keys))
                     assert arches
                 else:
                     arches = sorted(keys)
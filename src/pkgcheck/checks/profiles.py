@@ -2,13 +2,13 @@
 
 from datetime import datetime
 import os
-from collections import defaultdict
 from typing import Iterable
 
 from pkgcore.ebuild import misc
 from pkgcore.ebuild import profiles as profiles_mod
 from pkgcore.ebuild.atom import atom as atom_cls
 from pkgcore.ebuild.repo_objs import Profiles
+from snakeoil import klass
 from snakeoil.osutils import pjoin
 from snakeoil.sequences import iflatten_instance
 from snakeoil.strings import pluralism
@@ -27,7 +27,7 @@ class OutdatedProfilePackage(results.ProfilesResult, results.Warning):
         self.atom = str(atom)
         self.age = float(age)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"{self.path!r}: outdated package entry: {self.atom!r}, last match removed {self.age} years ago"
 
@@ -40,7 +40,7 @@ class UnknownProfilePackage(results.ProfilesResult, results.Warning):
         self.path = path
         self.atom = str(atom)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"{self.path!r}: unknown package: {self.atom!r}"
 
@@ -57,7 +57,7 @@ class UnmatchedProfilePackageUnmask(results.ProfilesResult, results.Warning):
         self.path = path
         self.atom = str(atom)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"{self.path!r}: unmask of not masked package: {self.atom!r}"
 
@@ -71,7 +71,7 @@ class UnknownProfilePackageUse(results.ProfilesResult, results.Warning):
         self.atom = str(atom)
         self.flags = tuple(flags)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.flags)
         flags = ", ".join(self.flags)
@@ -87,7 +87,7 @@ class UnknownProfileUse(results.ProfilesResult, results.Warning):
         self.path = path
         self.flags = tuple(flags)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.flags)
         flags = ", ".join(map(repr, self.flags))
@@ -103,7 +103,7 @@ class UnknownProfilePackageKeywords(results.ProfilesResult, results.Warning):
         self.atom = str(atom)
         self.keywords = tuple(keywords)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.keywords)
         keywords = ", ".join(map(repr, self.keywords))
@@ -119,7 +119,7 @@ class UnknownProfileUseExpand(results.ProfilesResult, results.Warning):
         self.var = var
         self.groups = tuple(groups)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.groups)
         groups = ", ".join(self.groups)
@@ -135,7 +135,7 @@ class UnknownProfileUseExpandValue(results.ProfilesResult, results.Warning):
         self.group = group
         self.values = tuple(values)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.values)
         values = ", ".join(self.values)
@@ -150,7 +150,7 @@ class ProfileMissingImplicitExpandValues(results.ProfilesResult, results.Warning
         self.path = path
         self.groups = tuple(groups)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.groups)
         groups = ", ".join(self.groups)
@@ -165,7 +165,7 @@ class UnknownProfileArch(results.ProfilesResult, results.Warning):
         self.path = path
         self.arch = arch
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"{self.path!r}: unknown ARCH {self.arch!r}"
 
@@ -237,6 +237,7 @@ class ProfilesCheck(Check):
         super().__init__(*args)
         repo = self.options.target_repo
         self.keywords = keywords_addon
+        self.valid_keywords = frozenset(keywords_addon.valid)
         self.search_repo = self.options.search_repo
         self.profiles_dir = repo.config.profiles_base
         self.today = datetime.today()
@@ -254,6 +255,49 @@ class ProfilesCheck(Check):
             | use_addon.global_iuse_implicit
         )
 
+        # the same atoms tend to be repeated across stacked profiles
+        self.match_cache = {}
+        self.pkgs_by_key = {}
+        self.pkg_iuse_cache = {}
+        self.profile_node_cache = {}
+
+    def _match(self, atom):
+        """Return the cached search repo matches for a given atom."""
+        pkgs = self.match_cache.get(atom)
+        if pkgs is None:
+            if not isinstance(atom, atom_cls):
+                pkgs = tuple(self.search_repo.match(atom))
+            else:
+                # query the repo once per package, versioned atoms filter those matches
+                pkgs = self.pkgs_by_key.get(atom.key)
+                if pkgs is None:
+                    pkgs = tuple(self.search_repo.match(atom.unversioned_atom))
+                    self.pkgs_by_key[atom.key] = pkgs
+                if not atom.is_simple or atom.blocks:
+                    pkgs = tuple(pkg for pkg in pkgs if atom.match(pkg))
+            self.match_cache[atom] = pkgs
+        return pkgs
+
+    def _pkg_iuse(self, atom):
+        """Return the cached set of USE flags available for an atom's matches."""
+        available = self.pkg_iuse_cache.get(atom)
+        if available is None:
+            available = frozenset(u for pkg in self._match(atom) for u in pkg.iuse_stripped)
+            self.pkg_iuse_cache[atom] = available
+        return available
+
+    def _probe_profile(self, path):
+        """Determine if a given profile path is valid, caching the result."""
+        valid = self.profile_node_cache.get(path)
+        if valid is None:
+            try:
+                addons.profiles.ProfileNode(pjoin(self.profiles_dir, path))
+                valid = True
+            except profiles_mod.ProfileError:
+                valid = False
+            self.profile_node_cache[path] = valid
+        return valid
+
     def _report_unknown_atom(self, path, atom):
         if not isinstance(atom, atom_cls):
             atom = atom_cls(atom)
@@ -275,9 +319,7 @@ class ProfilesCheck(Check):
         # make sure replacement profile exists
         if vals is not None:
             replacement, _msg = vals
-            try:
-                addons.profiles.ProfileNode(pjoin(self.profiles_dir, replacement))
-            except profiles_mod.ProfileError:
+            if not self._probe_profile(replacement):
                 yield ProfileError(
                     f"nonexistent replacement {replacement!r} "
                     f"for deprecated profile: {node.name!r}"
@@ -287,7 +329,9 @@ class ProfilesCheck(Check):
     @verify_files(("package.keywords", "keywords"), ("package.accept_keywords", "accept_keywords"))
     def _pkg_keywords(self, filename, node, vals):
         for atom, keywords in vals:
-            if invalid := sorted(set(keywords) - self.keywords.valid):
+            if not self.valid_keywords.issuperset(keywords):
+                # keywords are already deduplicated when parsed
+                invalid = sorted(k for k in keywords if k not in self.valid_keywords)
                 yield UnknownProfilePackageKeywords(pjoin(node.name, filename), atom, invalid)
 
     @verify_files(
@@ -301,10 +345,13 @@ class ProfilesCheck(Check):
         d = vals.render_to_dict()
         for _, entries in d.items():
             for _, disabled, enabled in entries:
-                if unknown_disabled := set(disabled) - self.available_iuse:
+                # flags are almost always known so avoid building sets up front
+                if not self.available_iuse.issuperset(disabled):
+                    unknown_disabled = set(disabled).difference(self.available_iuse)
                     flags = ("-" + u for u in unknown_disabled)
                     yield UnknownProfileUse(pjoin(node.name, filename), sorted(flags))
-                if unknown_enabled := set(enabled) - self.available_iuse:
+                if not self.available_iuse.issuperset(enabled):
+                    unknown_enabled = set(enabled).difference(self.available_iuse)
                     yield UnknownProfileUse(pjoin(node.name, filename), sorted(unknown_enabled))
 
     @verify_files(
@@ -314,7 +361,7 @@ class ProfilesCheck(Check):
     )
     def _pkg_atoms(self, filename, node, vals):
         for x in iflatten_instance(vals, atom_cls):
-            if not isinstance(x, bool) and not self.search_repo.match(x):
+            if not isinstance(x, bool) and not self._match(x):
                 yield self._report_unknown_atom(pjoin(node.name, filename), x)
 
     @verify_files(
@@ -327,10 +374,10 @@ class ProfilesCheck(Check):
 
         unmasked, masked = vals
         for x in masked:
-            if not self.search_repo.match(x):
+            if not self._match(x):
                 yield self._report_unknown_atom(pjoin(node.name, filename), x)
         for x in unmasked:
-            if not self.search_repo.match(x):
+            if not self._match(x):
                 yield self._report_unknown_atom(pjoin(node.name, filename), x)
             elif x not in all_masked:
                 yield UnmatchedProfilePackageUnmask(pjoin(node.name, filename), x)
@@ -350,12 +397,14 @@ class ProfilesCheck(Check):
 
         for _pkg, entries in d.items():
             for a, disabled, enabled in entries:
-                if pkgs := self.search_repo.match(a):
-                    available = {u for pkg in pkgs for u in pkg.iuse_stripped}
-                    if unknown_disabled := set(disabled) - available:
+                if self._match(a):
+                    available = self._pkg_iuse(a)
+                    if not available.issuperset(disabled):
+                        unknown_disabled = set(disabled).difference(available)
                         flags = ("-" + u for u in unknown_disabled)
                         yield UnknownProfilePackageUse(pjoin(node.name, filename), a, flags)
-                    if unknown_enabled := set(enabled) - available:
+                    if not available.issuperset(enabled):
+                        unknown_enabled = set(enabled).difference(available)
                         yield UnknownProfilePackageUse(
                             pjoin(node.name, filename), a, unknown_enabled
                         )
@@ -410,11 +459,14 @@ class ProfilesCheck(Check):
                 yield UnknownProfileArch(pjoin(node.name, filename), arch)
 
     def feed(self, profile: sources.Profile):
-        for f in profile.files.intersection(self.known_files):
-            attr, func = self.known_files[f]
+        node = profile.node
+        known_files = self.known_files
+        # profile dirs hold few files so iterate over them instead of all known files
+        matched = [(f, known_files[f]) for f in profile.files if f in known_files]
+        for f, (attr, func) in matched:
             with base.LogReports(*_logmap) as log_reports:
-                data = getattr(profile.node, attr)
-            yield from func(self, f, profile.node, data)
+                data = getattr(node, attr)
+            yield from func(self, f, node, data)
             yield from log_reports
 
 
@@ -425,7 +477,7 @@ class UnusedProfileDirs(results.ProfilesResult, results.Warning):
         super().__init__()
         self.dirs = tuple(dirs)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         s = pluralism(self.dirs)
         dirs = ", ".join(map(repr, self.dirs))
@@ -439,7 +491,7 @@ class ArchesWithoutProfiles(results.ProfilesResult, results.Warning):
         super().__init__()
         self.arches = tuple(arches)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         es = pluralism(self.arches, plural="es")
         arches = ", ".join(self.arches)
@@ -453,7 +505,7 @@ class NonexistentProfilePath(results.ProfilesResult, results.Error):
         super().__init__()
         self.path = path
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"nonexistent profile path: {self.path!r}"
 
@@ -468,7 +520,7 @@ class LaggingProfileEapi(results.ProfilesResult, results.Warning):
         self.parent = parent
         self.parent_eapi = parent_eapi
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return (
             f"{self.profile!r} profile has EAPI {self.eapi}, "
@@ -486,7 +538,7 @@ class _ProfileEapiResult(results.ProfilesResult):
         self.profile = profile
         self.eapi = str(eapi)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         return f"{self.profile!r} profile is using {self._type} EAPI {self.eapi}"
 
@@ -513,7 +565,7 @@ class UnknownCategoryDirs(results.ProfilesResult, results.Warning):
         super().__init__()
         self.dirs = tuple(dirs)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         dirs = ", ".join(self.dirs)
         s = pluralism(self.dirs)
@@ -527,7 +579,7 @@ class NonexistentCategories(results.ProfilesResult, results.Warning):
         super().__init__()
         self.categories = tuple(categories)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         categories = ", ".join(self.categories)
         ies = pluralism(self.categories, singular="y", plural="ies")
@@ -541,7 +593,7 @@ class ArchesOutOfSync(results.ProfilesResult, results.Error):
         super().__init__()
         self.arches = tuple(arches)
 
-    @property
+    @klass.jit_attr
     def desc(self):
         es = pluralism(self.arches, plural="es")
         arches = ", ".join(self.arches)
@@ -549,17 +601,35 @@ class ArchesOutOfSync(results.ProfilesResult, results.Error):
 
 
 def dir_parents(path):
-    """Yield all directory path parents excluding the root directory.
+    """Yield a directory path and all its parents excluding the root directory.
 
     Example:
     >>> list(dir_parents('/root/foo/bar/baz'))
-    ['root/foo/bar', 'root/foo', 'root']
+    ['root/foo/bar/baz', 'root/foo/bar', 'root/foo', 'root']
     """
     path = os.path.normpath(path.strip("/"))
     while path:
         yield path
-        dirname, _basename = os.path.split(path)
-        path = dirname.rstrip("/")
+        i = path.rfind("/")
+        path = path[:i] if i > 0 else ""
+
+
+def walk_dirs(root, path="", skip=frozenset()):
+    """Recursively yield all subdirectory paths relative to a given root.
+
+    Symlinked directories are neither yielded nor descended into and top-level
+    directories named in ``skip`` are ignored.
+    """
+    try:
+        with os.scandir(pjoin(root, path)) as it:
+            dirs = [x.name for x in it if x.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for d in dirs:
+        if path or d not in skip:
+            subdir = pjoin(path, d)
+            yield subdir
+            yield from walk_dirs(root, subdir)
 
 
 class RepoProfilesCheck(RepoCheck):
@@ -612,11 +682,8 @@ class RepoProfilesCheck(RepoCheck):
             yield ArchesWithoutProfiles(sorted(arches_without_profiles))
 
         root_profile_dirs = {"embedded"}
-        available_profile_dirs = set()
-        for root, _dirs, _files in os.walk(self.profiles_dir):
-            if d := root[len(self.profiles_dir) :].lstrip("/"):
-                available_profile_dirs.add(d)
-        available_profile_dirs -= self.non_profile_dirs | root_profile_dirs
+        available_profile_dirs = set(walk_dirs(self.profiles_dir, skip=self.non_profile_dirs))
+        available_profile_dirs -= root_profile_dirs
 
         # don't check for acceptable profile statuses on overlays
         if self.options.gentoo_repo:
@@ -640,7 +707,7 @@ class RepoProfilesCheck(RepoCheck):
         seen_profile_dirs = set()
         banned_profile_eapi = set()
         deprecated_profile_eapi = set()
-        lagging_profile_eapi = defaultdict(list)
+        lagging_profile_eapi = {}
         for p in profiles:
             try:
                 profile = profiles_mod.ProfileStack(pjoin(self.profiles_dir, p.path))
@@ -648,16 +715,22 @@ class RepoProfilesCheck(RepoCheck):
                 yield NonexistentProfilePath(p.path)
                 continue
             for parent in profile.stack:
-                seen_profile_dirs.update(dir_parents(parent.name))
+                # parents are shared between profiles, stop at the first seen dir
+                # since all its parent dirs were added along with it
+                for d in dir_parents(parent.name):
+                    if d in seen_profile_dirs:
+                        break
+                    seen_profile_dirs.add(d)
                 if profile.eapi is not parent.eapi and profile.eapi in parent.eapi.inherits:
-                    lagging_profile_eapi[profile].append(parent)
-                if str(parent.eapi) in banned_eapis:
+                    # only the last lagging parent is reported
+                    lagging_profile_eapi[profile] = parent
+                parent_eapi = str(parent.eapi)
+                if parent_eapi in banned_eapis:
                     banned_profile_eapi.add(parent)
-                if str(parent.eapi) in deprecated_eapis:
+                if parent_eapi in deprecated_eapis:
                     deprecated_profile_eapi.add(parent)
 
-        for profile, parents in lagging_profile_eapi.items():
-            parent = parents[-1]
+        for profile, parent in lagging_profile_eapi.items():
             yield LaggingProfileEapi(profile.name, str(profile.eapi), parent.name, str(parent.eapi))
         for profile in banned_profile_eapi:
             yield BannedProfileEapi(profile.name, profile.eapi)
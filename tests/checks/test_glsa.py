@@ -1,8 +1,11 @@
 import os
+from unittest.mock import patch
 
 import pytest
 from pkgcheck.checks import SkipCheck, glsa
 from pkgcore.ebuild import repo_objs, repository
+from pkgcore.ebuild.atom import atom
+from pkgcore.restrictions import packages, values
 from pkgcore.test.misc import mk_glsa
 from snakeoil.cli import arghparse
 from snakeoil.osutils import pjoin
@@ -71,3 +74,24 @@ class TestVulnerabilitiesCheck(misc.ReportTestCase):
 
         # multiple glsa matches
         self.assertReports(check, mk_pkg("1.0"))
+
+    def test_arch_restricted(self, tmp_path):
+        glsa_dir = str(tmp_path)
+        with open(pjoin(glsa_dir, "glsa-200611-03.xml"), "w") as f:
+            f.write(mk_glsa(("dev-util/diffball", ([], [">0.7"]), "x86")))
+        check = glsa.GlsaCheck(arghparse.Namespace(glsa_dir=glsa_dir, gentoo_repo=True))
+        pkg = misc.FakePkg("dev-util/diffball-1.0", data={"KEYWORDS": "~amd64 x86 -sparc"})
+        r = self.assertReport(check, pkg)
+        assert r.arches == ("x86",)
+        # packages not keyworded for the affected arches are ignored
+        pkg = misc.FakePkg("dev-util/diffball-1.0", data={"KEYWORDS": "amd64"})
+        self.assertNoReport(check, pkg)
+
+    def test_unexpected_keyword_restriction(self, tmp_path):
+        pkg_atom = atom("dev-util/diffball")
+        restrict = packages.PackageRestriction("keywords", values.StrExactMatch("x86"))
+        options = arghparse.Namespace(glsa_dir=str(tmp_path), gentoo_repo=True)
+        # invalid GLSA data is flagged when loading, not when scanning packages
+        with patch("pkgcheck.checks.glsa.GlsaDirSet", return_value=[(pkg_atom, restrict)]):
+            with pytest.raises(Exception, match="unexpected restriction sequence"):
+                glsa.GlsaCheck(options)
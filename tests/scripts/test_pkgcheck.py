@@ -1,4 +1,3 @@
-import importlib
 from functools import partial
 from unittest.mock import patch
 
@@ -26,7 +25,14 @@ def test_script_run(capsys):
             assert err[1].startswith(f"Verify that {project} and its deps")
             assert err[2] == "Add --debug to the commandline for a traceback."
 
-        # running with --debug should raise an ImportError when there are issues
+
+def test_script_run_debug(capsys):
+    """Running with --debug should raise an ImportError when there are issues."""
+    script = partial(run, project)
+
+    with patch(f"{project}.scripts.import_module") as import_module:
+        import_module.side_effect = ImportError("baz module doesn't exist")
+
         with patch("sys.argv", [project, "--debug"]):
             with pytest.raises(ImportError):
                 script()
@@ -36,8 +42,6 @@ def test_script_run(capsys):
             assert err[0] == "Failed importing: baz module doesn't exist!"
             assert err[1].startswith(f"Verify that {project} and its deps")
 
-        import_module.reset_mock()
-
 
 class TestPkgcheck:
     script = partial(run, project)
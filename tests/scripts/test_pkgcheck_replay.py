@@ -29,34 +29,33 @@ class TestPkgcheckReplay:
             assert err[0] == ("pkgcheck replay: error: the following arguments are required: FILE")
             assert excinfo.value.code == 2
 
-    def test_replay(self, capsys):
-        result = ProfileWarning("profile warning: foo")
-        with tempfile.NamedTemporaryFile() as file:
-            out = PlainTextFormatter(file)
-            with JsonStream(out) as reporter:
-                reporter.report(result)
-            with patch("sys.argv", self.args + ["-R", "StrReporter", file.name]):
-                with pytest.raises(SystemExit) as excinfo:
-                    self.script()
-                out, err = capsys.readouterr()
-                assert not err
-                assert out == "profile warning: foo\n"
-                assert excinfo.value.code == 0
+    @pytest.fixture
+    def replay_file(self, tmp_path):
+        """Return the path to a serialized results file containing a single result."""
+        path = tmp_path / "results.json"
+        with path.open("wb") as f:
+            with JsonStream(PlainTextFormatter(f)) as reporter:
+                reporter.report(ProfileWarning("profile warning: foo"))
+        return path
 
-    def test_corrupted_resuts(self, capsys):
-        result = ProfileWarning("profile warning: foo")
-        with tempfile.NamedTemporaryFile() as file:
-            out = PlainTextFormatter(file)
-            with JsonStream(out) as reporter:
-                reporter.report(result)
-            file.write(b"corrupted")
-            file.seek(0)
-            with patch("sys.argv", self.args + ["-R", "StrReporter", file.name]):
-                with pytest.raises(SystemExit) as excinfo:
-                    self.script()
-                out, err = capsys.readouterr()
-                assert "corrupted results file" in err
-                assert excinfo.value.code == 2
+    def test_replay(self, capsys, replay_file):
+        with patch("sys.argv", self.args + ["-R", "StrReporter", str(replay_file)]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            out, err = capsys.readouterr()
+            assert not err
+            assert out == "profile warning: foo\n"
+            assert excinfo.value.code == 0
+
+    def test_corrupted_resuts(self, capsys, replay_file):
+        with replay_file.open("ab") as f:
+            f.write(b"corrupted")
+        with patch("sys.argv", self.args + ["-R", "StrReporter", str(replay_file)]):
+            with pytest.raises(SystemExit) as excinfo:
+                self.script()
+            out, err = capsys.readouterr()
+            assert "corrupted results file" in err
+            assert excinfo.value.code == 2
 
     def test_invalid_file(self, capsys):
         with tempfile.NamedTemporaryFile(mode="wt") as file:
@@ -69,18 +68,12 @@ class TestPkgcheckReplay:
                 assert err.strip() == "pkgcheck replay: error: invalid or unsupported replay file"
                 assert excinfo.value.code == 2
 
-    def test_replay_pipe_stdin(self, capsys):
-        with tempfile.NamedTemporaryFile() as file:
-            out = PlainTextFormatter(file)
-            with JsonStream(out) as reporter:
-                reporter.report(ProfileWarning("profile warning: foo"))
-            file.seek(0)
-
-            with open(file.name) as stdin, patch("sys.stdin", stdin), patch(
-                "sys.argv", [*self.args, "-R", "StrReporter", "-"]
-            ), pytest.raises(SystemExit) as excinfo:
-                self.script()
-            out, err = capsys.readouterr()
-            assert not err
-            assert out == "profile warning: foo\n"
-            assert excinfo.value.code == 0
+    def test_replay_pipe_stdin(self, capsys, replay_file):
+        with replay_file.open() as stdin, patch("sys.stdin", stdin), patch(
+            "sys.argv", [*self.args, "-R", "StrReporter", "-"]
+        ), pytest.raises(SystemExit) as excinfo:
+            self.script()
+        out, err = capsys.readouterr()
+        assert not err
+        assert out == "profile warning: foo\n"
+        assert excinfo.value.code == 0
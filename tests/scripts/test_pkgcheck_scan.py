@@ -4,10 +4,8 @@ import shutil
 import subprocess
 import tempfile
 import textwrap
-from collections import defaultdict
-from functools import partial
+from functools import cache, partial
 from io import StringIO
-from operator import attrgetter
 from unittest.mock import patch
 
 import pytest
@@ -150,43 +148,41 @@ class TestPkgcheckScanParseArgs:
             assert options.target_repo.repo_id == "fake"
             assert list(options.restrictions) == [(base.repo_scope, packages.AlwaysTrue)]
 
-    def test_unknown_repo(self, tmp_path, capsys, tool):
-        for opt in ("-r", "--repo"):
-            with pytest.raises(SystemExit) as excinfo:
-                with chdir(str(tmp_path)):
-                    options, _ = tool.parse_args(["scan", opt, "foo"])
-            assert excinfo.value.code == 2
-            out, err = capsys.readouterr()
-            assert not out
-            assert err.startswith(
-                "pkgcheck scan: error: argument -r/--repo: couldn't find repo 'foo'"
-            )
+    @pytest.mark.parametrize("opt", ("-r", "--repo"))
+    def test_unknown_repo(self, opt, tmp_path, capsys, tool):
+        with pytest.raises(SystemExit) as excinfo:
+            with chdir(str(tmp_path)):
+                options, _ = tool.parse_args(["scan", opt, "foo"])
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert not out
+        assert err.startswith("pkgcheck scan: error: argument -r/--repo: couldn't find repo 'foo'")
 
-    def test_invalid_repo(self, tmp_path, capsys, tool):
+    @pytest.mark.parametrize("opt", ("-r", "--repo"))
+    def test_invalid_repo(self, opt, tmp_path, capsys, tool):
         (tmp_path / "foo").touch()
-        for opt in ("-r", "--repo"):
-            with pytest.raises(SystemExit) as excinfo:
-                with chdir(str(tmp_path)):
-                    options, _ = tool.parse_args(["scan", opt, "foo"])
-            assert excinfo.value.code == 2
-            out, err = capsys.readouterr()
-            assert not out
-            assert err.startswith("pkgcheck scan: error: argument -r/--repo: repo init failed:")
+        with pytest.raises(SystemExit) as excinfo:
+            with chdir(str(tmp_path)):
+                options, _ = tool.parse_args(["scan", opt, "foo"])
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert not out
+        assert err.startswith("pkgcheck scan: error: argument -r/--repo: repo init failed:")
 
-    def test_valid_repo(self, tool):
-        for opt in ("-r", "--repo"):
-            options, _ = tool.parse_args(["scan", opt, "standalone"])
-            assert options.target_repo.repo_id == "standalone"
-            assert list(options.restrictions) == [(base.repo_scope, packages.AlwaysTrue)]
+    @pytest.mark.parametrize("opt", ("-r", "--repo"))
+    def test_valid_repo(self, opt, tool):
+        options, _ = tool.parse_args(["scan", opt, "standalone"])
+        assert options.target_repo.repo_id == "standalone"
+        assert list(options.restrictions) == [(base.repo_scope, packages.AlwaysTrue)]
 
-    def test_unknown_reporter(self, capsys, tool):
-        for opt in ("-R", "--reporter"):
-            with pytest.raises(SystemExit) as excinfo:
-                options, _ = tool.parse_args(["scan", opt, "foo"])
-            assert excinfo.value.code == 2
-            out, err = capsys.readouterr()
-            assert not out
-            assert err.startswith("pkgcheck scan: error: no reporter matches 'foo'")
+    @pytest.mark.parametrize("opt", ("-R", "--reporter"))
+    def test_unknown_reporter(self, opt, capsys, tool):
+        with pytest.raises(SystemExit) as excinfo:
+            options, _ = tool.parse_args(["scan", opt, "foo"])
+        assert excinfo.value.code == 2
+        out, err = capsys.readouterr()
+        assert not out
+        assert err.startswith("pkgcheck scan: error: no reporter matches 'foo'")
 
     def test_format_reporter(self, capsys, tool):
         # missing --format
@@ -372,27 +368,111 @@ class TestPkgcheckScanParseConfigArgs:
             assert options.jobs == 9999
 
 
+_repos_data = pytest.REPO_ROOT / "testdata/data/repos"
+_repos_dir = pytest.REPO_ROOT / "testdata/repos"
+# nested mapping of repos to checks/keywords their test data covers
+_repo_checks = {
+    repo.name: {check.name: frozenset(x.name for x in check.iterdir()) for check in repo.iterdir()}
+    for repo in sorted(_repos_data.iterdir())
+    if repo.name != "network"
+}
+
+
+def _scan_args(testconfig, cache_dir):
+    """Return the base args and the args for running `pkgcheck scan` via API call."""
+    return ["--config", testconfig], ["--config", "no", "--cache-dir", cache_dir]
+
+
+def _run_script(script, repo_path):
+    """Run a test data script against a given repo, failing the test on errors."""
+    try:
+        subprocess.run([script], cwd=repo_path, capture_output=True, check=True, text=True)
+    except subprocess.CalledProcessError as exc:
+        error = exc.stderr if exc.stderr else exc.stdout
+        pytest.fail(error)
+
+
+def _data_fixes(repos_data, repos):
+    """Yield (repo, check, keyword) tuples for all bundled test data providing fixes."""
+    for repo in repos:
+        for keyword_dir in sorted((repos_data / repo).glob("*/*")):
+            if any((keyword_dir / x).exists() for x in ("fix.patch", "fix.sh")):
+                yield repo, keyword_dir.parent.name, keyword_dir.name
+
+
+@cache
+def _data_triggers(repo_data):
+    """Return the trigger scripts defined by a repo's test data."""
+    return tuple(
+        pjoin(root, "trigger.sh")
+        for root, _dirs, files in os.walk(repo_data)
+        if "trigger.sh" in files
+    )
+
+
+@pytest.fixture(scope="class")
+def repo_results(testconfig, cache_dir, tmp_path_factory):
+    """Return a function scanning bundled repos, caching results for the test class."""
+    base_args, scan_args = _scan_args(testconfig, cache_dir)
+    repo_scan = partial(scan, base_args=base_args)
+    repo_dirs = {}
+    results = {}
+
+    def _repo_dir(repo):
+        """Return the dir to scan for a repo, running any triggers against a copy once."""
+        if (repo_dir := repo_dirs.get(repo)) is None:
+            repo_dir = _repos_dir / repo
+            if triggers := _data_triggers(_repos_data / repo):
+                triggered_repo = tmp_path_factory.mktemp("triggered") / repo
+                shutil.copytree(repo_dir, triggered_repo)
+                for trigger in triggers:
+                    _run_script(trigger, triggered_repo)
+                repo_dir = triggered_repo
+            repo_dirs[repo] = repo_dir
+        return repo_dir
+
+    def _repo_results(repo, verbosity=0):
+        if (repo, verbosity) in results:
+            return results[(repo, verbosity)]
+
+        repo_dir = _repo_dir(repo)
+        args = (["-v"] * verbosity) + ["-r", str(repo_dir), "-c", ",".join(_repo_checks[repo])]
+
+        # add any defined extra repo args
+        try:
+            args.extend(shlex.split((repo_dir / "metadata/pkgcheck-args").read_text()))
+        except FileNotFoundError:
+            pass
+
+        results[(repo, verbosity)] = repo_results = []
+        for result in repo_scan(scan_args + args):
+            # ignore results generated from stubs
+            stubs = (getattr(result, x, "") for x in ("category", "package"))
+            if any(x.startswith("stub") for x in stubs):
+                continue
+            repo_results.append(result)
+        return repo_results
+
+    return _repo_results
+
+
 class TestPkgcheckScan:
     script = staticmethod(partial(run, project))
 
-    repos_data = pytest.REPO_ROOT / "testdata/data/repos"
-    repos_dir = pytest.REPO_ROOT / "testdata/repos"
-    repos = tuple(sorted(x.name for x in repos_data.iterdir() if x.name != "network"))
-
-    _all_results = [
-        (cls, result)
-        for name, cls in sorted(objects.CHECKS.items())
-        if not issubclass(cls, checks_mod.NetworkCheck)
-        for result in sorted(cls.known_results, key=attrgetter("__name__"))
-    ]
+    repos_data = _repos_data
+    repos_dir = _repos_dir
+    _checks = _repo_checks
+    repos = tuple(_checks)
+    # (repo, check, keyword) combinations with fixes available
+    fixes = tuple(_data_fixes(repos_data, repos))
+    # keep all scans of a repo on the same xdist worker so they share cached results
+    grouped_repos = tuple(pytest.param(repo, marks=pytest.mark.xdist_group(repo)) for repo in repos)
 
     @pytest.fixture(autouse=True)
-    def _setup(self, testconfig, tmp_path):
-        self.cache_dir = str(tmp_path)
-        base_args = ["--config", testconfig]
+    def _setup(self, testconfig, cache_dir):
+        # share pkgcheck's on-disk caches across scans
+        base_args, self.scan_args = _scan_args(testconfig, cache_dir)
         self.scan = partial(scan, base_args=base_args)
-        # args for running `pkgcheck scan` via API call
-        self.scan_args = ["--config", "no", "--cache-dir", self.cache_dir]
         # args for running pkgcheck like a script
         self.args = [project] + base_args + ["scan"] + self.scan_args
 
@@ -529,77 +609,26 @@ class TestPkgcheckScan:
             with pytest.raises(base.PkgcheckException, match="Exception: pipeline failed"):
                 list(self.scan(self.scan_args))
 
-    # nested mapping of repos to checks/keywords they cover
-    _checks = defaultdict(lambda: defaultdict(set))
-
     @pytest.mark.parametrize("repo", repos)
     def test_scan_repo_data(self, repo):
         """Make sure the test data is up to date check/result naming wise."""
-        for check in (self.repos_data / repo).iterdir():
-            assert check.name in objects.CHECKS
-            for keyword in check.iterdir():
-                assert keyword.name in objects.KEYWORDS
-                self._checks[repo][check.name].add(keyword.name)
-
-    @staticmethod
-    def _script(fix, repo_path):
-        try:
-            subprocess.run([fix], cwd=repo_path, capture_output=True, check=True, text=True)
-        except subprocess.CalledProcessError as exc:
-            error = exc.stderr if exc.stderr else exc.stdout
-            pytest.fail(error)
-
-    # mapping of repos to scanned results
-    _results = {}
-    _verbose_results = {}
-
-    @pytest.mark.parametrize("repo", repos)
-    def test_scan_repo(self, repo, tmp_path, verbosity=0):
-        """Scan a target repo, saving results for verification."""
-        repo_dir = self.repos_dir / repo
-
-        # run all existing triggers
-        triggers = [
-            pjoin(root, "trigger.sh")
-            for root, _dirs, files in os.walk(self.repos_data / repo)
-            if "trigger.sh" in files
-        ]
-        if triggers:
-            triggered_repo = tmp_path / f"triggered-{repo}"
-            shutil.copytree(repo_dir, triggered_repo)
-            for trigger in triggers:
-                self._script(trigger, triggered_repo)
-            repo_dir = triggered_repo
-
-        if repo not in self._checks:
-            self.test_scan_repo_data(repo)
-        args = (["-v"] * verbosity) + ["-r", str(repo_dir), "-c", ",".join(self._checks[repo])]
-
-        # add any defined extra repo args
-        try:
-            args.extend(shlex.split((repo_dir / "metadata/pkgcheck-args").read_text()))
-        except FileNotFoundError:
-            pass
+        for check, keywords in self._checks[repo].items():
+            assert check in objects.CHECKS
+            for keyword in keywords:
+                assert keyword in objects.KEYWORDS
 
-        results = []
-        for result in self.scan(self.scan_args + args):
-            # ignore results generated from stubs
-            stubs = (getattr(result, x, "") for x in ("category", "package"))
-            if any(x.startswith("stub") for x in stubs):
-                continue
-            results.append(result)
+    _script = staticmethod(_run_script)
 
-        if verbosity:
-            self._verbose_results[repo] = set(results)
-            assert len(results) == len(self._verbose_results[repo])
-        else:
-            self._results[repo] = set(results)
-            assert len(results) == len(self._results[repo])
+    @pytest.mark.parametrize("repo", grouped_repos)
+    def test_scan_repo(self, repo, repo_results, verbosity=0):
+        """Scan a target repo, verifying no duplicate results are generated."""
+        results = repo_results(repo, verbosity)
+        assert len(results) == len(set(results))
 
-    @pytest.mark.parametrize("repo", repos)
-    def test_scan_repo_verbose(self, repo, tmp_path):
-        """Scan a target repo in verbose mode, saving results for verification."""
-        return self.test_scan_repo(repo, tmp_path, verbosity=1)
+    @pytest.mark.parametrize("repo", grouped_repos)
+    def test_scan_repo_verbose(self, repo, repo_results):
+        """Scan a target repo in verbose mode, verifying no duplicate results are generated."""
+        return self.test_scan_repo(repo, repo_results, verbosity=1)
 
     def _get_results(self, path):
         """Return the set of result objects from a given json stream file."""
@@ -619,15 +648,13 @@ class TestPkgcheckScan:
             output = f.read().decode()
             return output
 
-    @pytest.mark.parametrize("repo", repos)
-    def test_scan_verify(self, repo, tmp_path):
+    @pytest.mark.parametrize("repo", grouped_repos)
+    def test_scan_verify(self, repo, repo_results):
         """Run pkgcheck against test pkgs in bundled repo, verifying result output."""
         results = set()
         verbose_results = set()
-        if repo not in self._results:
-            self.test_scan_repo(repo, tmp_path, verbosity=0)
-        if repo not in self._verbose_results:
-            self.test_scan_repo(repo, tmp_path, verbosity=1)
+        scan_results = set(repo_results(repo))
+        verbose_scan_results = set(repo_results(repo, verbosity=1))
         for check, keywords in self._checks[repo].items():
             for keyword in keywords:
                 # verify the expected results were seen during the repo scans
@@ -648,18 +675,18 @@ class TestPkgcheckScan:
                 else:
                     verbose_results.update(expected_results)
 
-        if results != self._results[repo]:
-            missing = self._render_results(results - self._results[repo])
-            unknown = self._render_results(self._results[repo] - results)
+        if results != scan_results:
+            missing = self._render_results(results - scan_results)
+            unknown = self._render_results(scan_results - results)
             error = ["unmatched repo scan results:"]
             if missing:
                 error.append(f"{repo} repo missing expected results:\n{missing}")
             if unknown:
                 error.append(f"{repo} repo unknown results:\n{unknown}")
             pytest.fail("\n".join(error))
-        if verbose_results != self._verbose_results[repo]:
-            missing = self._render_results(verbose_results - self._verbose_results[repo])
-            unknown = self._render_results(self._verbose_results[repo] - verbose_results)
+        if verbose_results != verbose_scan_results:
+            missing = self._render_results(verbose_results - verbose_scan_results)
+            unknown = self._render_results(verbose_scan_results - verbose_results)
             error = ["unmatched verbose repo scan results:"]
             if missing:
                 error.append(f"{repo} repo missing expected results:\n{missing}")
@@ -683,44 +710,52 @@ class TestPkgcheckScan:
                 error = exc.stderr if exc.stderr else exc.stdout
                 pytest.fail(error)
 
-    @pytest.mark.parametrize("check, result", _all_results)
-    def test_fix(self, check, result, tmp_path):
-        """Apply fixes to pkgs, verifying the related results are fixed."""
-        check_name = check.__name__
-        keyword = result.__name__
-        tested = False
-        for repo in self.repos:
-            keyword_dir = self.repos_data / repo / check_name / keyword
-            if (fix := keyword_dir / "fix.patch").exists():
-                func = self._patch
-            elif (fix := keyword_dir / "fix.sh").exists():
-                func = self._script
-            else:
-                continue
-
-            # apply a fix if one exists and make sure the related result doesn't appear
-            repo_dir = self.repos_dir / repo
-            fixed_repo = tmp_path / f"fixed-{repo}"
-            shutil.copytree(repo_dir, fixed_repo)
-            func(fix, fixed_repo)
+    @staticmethod
+    def _copy_repo(repo_dir, dest, link=False):
+        """Copy a repo, optionally hardlinking its files instead.
 
-            args = ["-r", str(fixed_repo), "-c", check_name, "-k", keyword]
+        Hardlinking is only safe when the copy is modified via patch(1) which
+        writes out new files instead of altering the existing ones in place.
+        """
+        if link:
+            # resolve symlinks since relative ones would dangle inside the copy
+            def hardlink(src, dst):
+                os.link(os.path.realpath(src), dst)
 
-            # add any defined extra repo args
             try:
-                with open(f"{repo_dir}/metadata/pkgcheck-args") as f:
-                    args.extend(shlex.split(f.read()))
-            except FileNotFoundError:
-                pass
+                shutil.copytree(repo_dir, dest, copy_function=hardlink)
+                return
+            except OSError:
+                # fs doesn't support hardlinks, fallback to copying
+                shutil.rmtree(dest, ignore_errors=True)
+        shutil.copytree(repo_dir, dest)
+
+    @pytest.mark.parametrize("repo, check, keyword", fixes)
+    def test_fix(self, repo, check, keyword, tmp_path):
+        """Apply fixes to pkgs, verifying the related results are fixed."""
+        keyword_dir = self.repos_data / repo / check / keyword
+        if (fix := keyword_dir / "fix.patch").exists():
+            func = self._patch
+        else:
+            fix = keyword_dir / "fix.sh"
+            func = self._script
 
-            results = list(self.scan(self.scan_args + args))
-            if results:
-                error = ["unexpected repo scan results:"]
-                error.append(self._render_results(results))
-                pytest.fail("\n".join(error))
+        # apply the fix and make sure the related result doesn't appear
+        repo_dir = self.repos_dir / repo
+        fixed_repo = tmp_path / f"fixed-{repo}"
+        self._copy_repo(repo_dir, fixed_repo, link=func is self._patch)
+        func(fix, fixed_repo)
 
-            shutil.rmtree(fixed_repo)
-            tested = True
+        args = ["-r", str(fixed_repo), "-c", check, "-k", keyword]
 
-        if not tested:
-            pytest.skip("fix not available")
+        # add any defined extra repo args
+        try:
+            args.extend(shlex.split((repo_dir / "metadata/pkgcheck-args").read_text()))
+        except FileNotFoundError:
+            pass
+
+        results = list(self.scan(self.scan_args + args))
+        if results:
+            error = ["unexpected repo scan results:"]
+            error.append(self._render_results(results))
+            pytest.fail("\n".join(error))
@@ -8,6 +8,11 @@ from pkgcheck import base, objects
 from pkgcheck.addons import caches
 from pkgcheck.scripts import run
 
+# sorted object names as listed by `pkgcheck show`
+_keywords = sorted(objects.KEYWORDS)
+_checks = sorted(objects.CHECKS)
+_reporters = sorted(objects.REPORTERS)
+
 
 class TestPkgcheckShow:
     script = partial(run, project)
@@ -24,7 +29,7 @@ class TestPkgcheckShow:
             out, err = capsys.readouterr()
             assert not err
             out = out.strip().split("\n")
-            assert out == sorted(objects.KEYWORDS.keys())
+            assert out == _keywords
             assert excinfo.value.code == 0
 
     def test_show_keywords(self, capsys):
@@ -37,7 +42,7 @@ class TestPkgcheckShow:
                 assert not err
                 out = out.strip().split("\n")
                 regular_output = out
-                assert out == sorted(objects.KEYWORDS.keys())
+                assert out == _keywords
                 assert excinfo.value.code == 0
 
             # verbose mode
@@ -63,7 +68,7 @@ class TestPkgcheckShow:
                 assert not err
                 out = out.strip().split("\n")
                 regular_output = out
-                assert out == sorted(objects.CHECKS.keys())
+                assert out == _checks
                 assert excinfo.value.code == 0
 
             # verbose mode
@@ -114,7 +119,7 @@ class TestPkgcheckShow:
                 assert not err
                 out = out.strip().split("\n")
                 regular_output = out
-                assert out == sorted(objects.REPORTERS.keys())
+                assert out == _reporters
                 assert excinfo.value.code == 0
 
             # verbose mode